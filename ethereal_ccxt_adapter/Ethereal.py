@@ -3,14 +3,17 @@ import math
 import random
 import time
 from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from uuid import UUID
 
 import ccxt
 from ccxt import (
+    ArgumentsRequired,
     AuthenticationError,
+    BadRequest,
     InvalidOrder,
+    NetworkError,
     OrderNotFound, NotSupported,
 )
 from ccxt.base.types import (
@@ -23,11 +26,22 @@ from ccxt.base.types import (
     FundingRate, Int, Str,
 )
 
-from ethereal import AsyncRESTClient
-from ethereal.models.mainnet.rest import SubaccountDto, SubaccountBalanceDto
-from ethereal.models.rest import MarketPriceDto, MarketLiquidityDto
-
+from ethereal_ccxt_adapter.cache import ResponseCache
 from ethereal_ccxt_adapter.const import EOrderSide, EOrderStatus
+from ethereal_ccxt_adapter.order_tracker import OPEN_STATUSES, OrderTracker
+from ethereal_ccxt_adapter.policy import RequestPolicy
+from ethereal_ccxt_adapter.records import OrderRecord
+
+# the SDK (web3, pydantic models), httpx and numpy dominate the import time,
+# they are imported where first used
+if TYPE_CHECKING:
+    from ethereal import AsyncRESTClient
+    from ethereal.models.mainnet.rest import SubaccountDto, SubaccountBalanceDto
+    from ethereal.models.rest import MarketPriceDto
+
+    from ethereal_ccxt_adapter.cassette import Cassette
+    from ethereal_ccxt_adapter.funding import FundingHistory
+    from ethereal_ccxt_adapter.position_engine import PositionEngine
 
 
 # ---------------------------------------------------------
@@ -57,6 +71,7 @@ class Ethereal(ccxt.Exchange):
     name = "Ethereal"
     rateLimit = 1000
     base_url = "https://api.ethereal.trade"
+    rpc_url = "https://rpc.ethereal.trade"
 
     def __init__(self, config: Dict[str, Any] = {}):
         super().__init__(config)
@@ -67,14 +82,36 @@ class Ethereal(ccxt.Exchange):
         self.walletAddress = self.safe_string(config, 'wallet_address', self.walletAddress)
         self.privateKey = self.safe_string(config, 'private_key', self.privateKey)
         self.l1WalletAddress = self.safe_string(config, 'l1_wallet_address')
+        self.base_url = self.safe_string(config, 'base_url', self.base_url)
+        self.rpc_url = self.safe_string(config, 'rpc_url', self.rpc_url)
+        self.record_to = self.safe_string(config, 'record_to')
 
-        self.client: AsyncRESTClient = run(AsyncRESTClient.create({
-            "base_url": "https://api.ethereal.trade",
-            "chain_config": {
-                "rpc_url": "https://rpc.ethereal.trade",
-                "private_key": self.privateKey,
-            }
-        }))
+        # record / replay of the SDK http traffic, see cassette.py
+        self.cassette: Optional["Cassette"] = None
+        self.client: "AsyncRESTClient" = run(self._create_client(config))
+
+        # retries, hedged reads and deadlines, 'request_policy': {RequestPolicy kwargs}
+        self.policy = RequestPolicy(**(self.safe_value(config, 'request_policy') or {}))
+
+        # opt-in read cache, 'cache_ttl': True or {endpoint: seconds}
+        cache_ttl = self.safe_value(config, 'cache_ttl')
+        self.cache: Optional[ResponseCache] = None
+        if cache_ttl:
+            self.cache = ResponseCache(cache_ttl if isinstance(cache_ttl, dict) else None,
+                                       self.safe_integer(config, 'cache_size', 1024))
+
+        # positions are folded from fills, a full snapshot is reloaded every position_resync seconds
+        self.position_engines: Dict[Any, "PositionEngine"] = {}
+        self.position_resync = self.safe_number(config, 'position_resync', 60.0)
+
+        # funding rate history, fetched incrementally
+        self.funding_history: Optional["FundingHistory"] = None
+
+        # opt-in local order book serving fetch_open_orders / fetch_order
+        self.order_trackers: Dict[Any, OrderTracker] = {}
+        self.track_orders = self.safe_bool(config, 'track_orders', False)
+        self.order_staleness = self.safe_number(config, 'order_staleness', 2.0)
+        self.max_closed_orders = self.safe_integer(config, 'max_closed_orders', 1000)
 
         self.has.update({
             "spot": False,
@@ -98,7 +135,7 @@ class Ethereal(ccxt.Exchange):
             "cancelAllOrders": True,
             "fetchOrder": True,
             "fetchOrders": True,
-            "fetchOpenOrders": False,
+            "fetchOpenOrders": True,
             "fetchClosedOrders": True,
 
             "fetchPositions": True,
@@ -106,6 +143,7 @@ class Ethereal(ccxt.Exchange):
 
             "fetchFundingRate": True,
             "fetchFundingRates": True,
+            "fetchFundingRateHistory": True,
         })
 
         self.urls.update({
@@ -135,10 +173,57 @@ class Ethereal(ccxt.Exchange):
         self.name = "Ethereal"
         self.rateLimit = 1000
 
+        # every subaccount of the l1 wallet is usable via params['subaccount'],
+        # the first one is the default
+        self.subaccounts: Dict[str, SubaccountDto] = {}
         account: SubaccountDto = self.main_account()
         self.main_account_id = account.id
         self.main_account_name = account.name
 
+    async def _create_client(self, config: Dict[str, Any]) -> "AsyncRESTClient":
+        from ethereal import AsyncRESTClient
+
+        replay_from = self.safe_string(config, 'replay_from')
+        # sign without the RPC node, from the rpc config the (replayed) API serves
+        offline_chain = replay_from is not None or self.safe_bool(config, 'offline_chain', False)
+        chain_config = {
+            "rpc_url": self.rpc_url,
+            "private_key": self.privateKey,
+        }
+        client = AsyncRESTClient({
+            "base_url": self.base_url,
+            # an offline chain client is created below
+            "chain_config": None if offline_chain else chain_config,
+        })
+
+        if offline_chain or self.record_to is not None:
+            from ethereal_ccxt_adapter.cassette import (
+                Cassette, RecordingTransport, ReplayTransport, offline_chain_client,
+            )
+        if replay_from is not None:
+            self.cassette = Cassette.load(replay_from)
+            # not safe_value, None (as fast as possible) must not fall back to the default
+            transport = ReplayTransport(self.cassette, speed=config.get('replay_speed', 1.0))
+        elif self.record_to is not None:
+            self.cassette = Cassette(self.record_to)
+            transport = RecordingTransport(self.cassette)
+        else:
+            transport = None
+
+        if transport is not None:
+            import httpx
+
+            await client.session.aclose()
+            client.session = httpx.AsyncClient(transport=transport)
+
+        # same as AsyncRESTClient.create, split to install the transport first
+        await client._async_init()
+        if offline_chain:
+            client.chain = offline_chain_client(chain_config, client.rpc_config)
+            client.private_key = client.chain.private_key
+            client.provider = client.chain.provider
+        return client
+
     # -----------------------------------------------------
     # Helpers
     # -----------------------------------------------------
@@ -156,11 +241,70 @@ class Ethereal(ccxt.Exchange):
     def _decimal_places(self, x):
         return int(-math.log10(float(x)))
 
+    def _read(self, endpoint, not_found=None, **kwargs):
+        return self.policy.call(endpoint, lambda: getattr(self.client, endpoint)(**kwargs), not_found=not_found,
+                                hedge=True)
+
+    def _write(self, endpoint, idempotent, not_found=None, **kwargs):
+        return self.policy.call(endpoint, lambda: getattr(self.client, endpoint)(**kwargs), idempotent, not_found,
+                                hedge=False)
+
+    def deadline(self, seconds: float):
+        """Bounds all requests inside ``with exchange.deadline(seconds):``, raising RequestTimeout."""
+        return self.policy.deadline(seconds)
+
+    def _cached(self, endpoint, key, loader):
+        if self.cache is None:
+            return loader()
+        return self.cache.get_or_load(endpoint, key, loader)
+
+    def _invalidate_account_cache(self, account_id):
+        if self.cache is None:
+            return
+        for endpoint in ("orders", "positions", "balance"):
+            self.cache.invalidate(endpoint, account_id)
+
+    def _subaccount(self, params=None) -> "SubaccountDto":
+        """Subaccount selected by params['subaccount'] (id or name), defaults to the main account."""
+        key = self.safe_string(params or {}, 'subaccount')
+        if key is None:
+            return self.subaccounts[str(self.main_account_id)]
+        account = self.subaccounts.get(key)
+        if account is not None:
+            return account
+        for account in self.subaccounts.values():
+            if key in (account.name, self._decode_subaccount_name(account.name)):
+                return account
+        raise BadRequest(self.id + ' unknown subaccount ' + key)
+
+    def _decode_subaccount_name(self, name):
+        # names are hex encoded bytes32, e.g. 0x7072696d617279000... for 'primary'
+        try:
+            return bytes.fromhex(name[2:] if name.startswith("0x") else name).rstrip(b"\x00").decode()
+        except ValueError:
+            return name
+
+    def _position_engine(self, account_id) -> "PositionEngine":
+        engine = self.position_engines.get(account_id)
+        if engine is None:
+            from ethereal_ccxt_adapter.position_engine import PositionEngine
+
+            engine = self.position_engines[account_id] = PositionEngine()
+        return engine
+
+    def _order_tracker(self, account_id) -> Optional[OrderTracker]:
+        if not self.track_orders:
+            return None
+        tracker = self.order_trackers.get(account_id)
+        if tracker is None:
+            tracker = self.order_trackers[account_id] = OrderTracker(self.order_staleness, self.max_closed_orders)
+        return tracker
+
     # -----------------------------------------------------
     # MARKETS
     # -----------------------------------------------------
     def fetch_markets(self, params={}) -> List[Market]:
-        products = run(self.client.list_products())
+        products = run(self._read("list_products"))
         markets = []
 
         for p in products:
@@ -205,9 +349,12 @@ class Ethereal(ccxt.Exchange):
 
         id = market["id"]
         # liquidity:MarketLiquidityDto = run(self.client.get_market_liquidity(product_id=id))
-        price: MarketPriceDto = run(self.client.list_market_prices(product_ids=[id]))[0]
+        price: MarketPriceDto = self._cached(
+            "ticker", id, lambda: run(self._read("list_market_prices", product_ids=[id]))[0])
+        return self._parse_ticker(symbol, price)
 
-        ts = self.milliseconds()
+    def _parse_ticker(self, symbol: str, price: "MarketPriceDto", ts=None) -> Ticker:
+        ts = ts or self.milliseconds()
         return {
             'symbol': symbol,
             'timestamp': ts,
@@ -231,19 +378,20 @@ class Ethereal(ccxt.Exchange):
         return {s: self.fetch_ticker(s) for s in (symbols or self.markets)}
 
     def fetch_accounts(self, params={}):
-        return run(self.client.list_subaccounts(sender=self.l1WalletAddress))
+        return run(self._read("list_subaccounts", sender=self.l1WalletAddress))
 
     # -----------------------------------------------------
     # TRADES
     # -----------------------------------------------------
     def fetch_trades(self, symbol: str, since=None, limit=100, params={}) -> List[Trade]:
         self.load_markets()
+        account = self._subaccount(params)
         if symbol is not None:
             market = self.markets[symbol]
             trades = run(
-                self.client.list_fills(subaccount_id=self.main_account_id, product_ids=[market["id"]], limit=limit))
+                self._read("list_fills", subaccount_id=account.id, product_ids=[market["id"]], limit=limit))
         else:
-            trades = run(self.client.list_fills(subaccount_id=self.main_account_id, limit=limit))
+            trades = run(self._read("list_fills", subaccount_id=account.id, limit=limit))
 
         out = []
 
@@ -265,16 +413,36 @@ class Ethereal(ccxt.Exchange):
     def fetch_my_trades(self, symbol=None, since=None, limit=100, params={}):
         return self.fetch_trades(symbol, since, limit, params)
 
-    def main_account(self) -> SubaccountDto:
-        sub_accounts = run(self.client.list_subaccounts(sender=self.l1WalletAddress))
+    def main_account(self) -> "SubaccountDto":
+        sub_accounts = self.load_subaccounts()
         return sub_accounts[0]
 
+    def load_subaccounts(self) -> List["SubaccountDto"]:
+        sub_accounts = run(self._read("list_subaccounts", sender=self.l1WalletAddress))
+        self.subaccounts = {str(a.id): a for a in sub_accounts}
+        return sub_accounts
+
     # -----------------------------------------------------
     # BALANCE
     # -----------------------------------------------------
     def fetch_balance(self, params={}) -> Balances:
-        balances: List[SubaccountBalanceDto] = run(
-            self.client.get_subaccount_balances(subaccount_id=self.main_account_id))
+        account = self._subaccount(params)
+        balances: List[SubaccountBalanceDto] = self._cached(
+            "balance", account.id,
+            lambda: run(self._read("get_subaccount_balances", subaccount_id=account.id)))
+        return self._parse_balance(balances)
+
+    def fetch_balances_all(self, params={}) -> Dict[str, Balances]:
+        """Balances of all subaccounts keyed by subaccount id, fetched concurrently."""
+        accounts = list(self.subaccounts.values())
+
+        async def fetch():
+            return await asyncio.gather(
+                *[self._read("get_subaccount_balances", subaccount_id=a.id) for a in accounts])
+
+        return {str(a.id): self._parse_balance(b) for a, b in zip(accounts, run(fetch()))}
+
+    def _parse_balance(self, balances: List["SubaccountBalanceDto"]) -> Balances:
         result = {
             "info": [b.model_dump() for b in balances]
         }
@@ -291,46 +459,225 @@ class Ethereal(ccxt.Exchange):
     # POSITIONS
     # -----------------------------------------------------
     def fetch_positions(self, symbols=None, params={}) -> List[Position]:
-        positions = run(self.client.list_positions(subaccount_id=self.main_account_id, open=True))
-        parsed = []
+        self.load_markets()
+        account = self._subaccount(params)
+        engine = self._position_engine(account.id)
+        if engine.is_stale(self.position_resync) or self.safe_bool(params, 'reload', False):
+            # a cached incremental update must not stand in for the resync
+            if self.cache is not None:
+                self.cache.invalidate("positions", account.id)
+            self._cached("positions", account.id, lambda: self._load_position_engine(account.id))
+        else:
+            self._cached("positions", account.id, lambda: self._update_position_engine(account.id))
+        return self._parse_positions(engine, symbols)
 
+    def fetch_positions_all(self, symbols=None, params={}) -> Dict[str, List[Position]]:
+        """Positions of all subaccounts keyed by subaccount id, fetched concurrently."""
+        self.load_markets()
+        accounts = list(self.subaccounts.values())
+
+        async def fetch():
+            return await asyncio.gather(
+                self._fetch_market_prices([m["id"] for m in self.markets.values()]),
+                *[asyncio.gather(self._read("list_positions", subaccount_id=a.id, open=True),
+                                 self._read("get_subaccount_balances", subaccount_id=a.id),
+                                 self._newest_fill(a.id))
+                  for a in accounts])
+
+        prices, *snapshots = run(fetch())
+        result = {}
+        for account, (positions, balances, newest_fill) in zip(accounts, snapshots):
+            engine = self._position_engine(account.id)
+            self._apply_position_snapshot(engine, positions, balances, prices, newest_fill)
+            result[str(account.id)] = self._parse_positions(engine, symbols)
+        return result
+
+    def refresh_positions(self, prices: Dict[str, float], symbols=None, params={}) -> List[Position]:
+        """
+        Re-marks the known positions with new prices ({symbol: price}) without
+        any request, e.g. from a ticker stream.
+        """
+        engine = self._position_engine(self._subaccount(params).id)
+        engine.update_prices({self.market_id(s): p for s, p in prices.items()})
+        return self._parse_positions(engine, symbols)
+
+    async def _fetch_market_prices(self, product_ids) -> List["MarketPriceDto"]:
+        # the endpoint accepts at most 50 products per request
+        chunks = [product_ids[i:i + 50] for i in range(0, len(product_ids), 50)]
+        results = await asyncio.gather(*[self._read("list_market_prices", product_ids=c) for c in chunks])
+        return [price for prices in results for price in prices]
+
+    def _collateral(self, balances: List["SubaccountBalanceDto"]) -> float:
+        return sum(float(b.amount) for b in balances if b.token_name == "USD")
+
+    def _load_position_engine(self, account_id):
+        async def load():
+            return await asyncio.gather(
+                self._read("list_positions", subaccount_id=account_id, open=True),
+                self._read("get_subaccount_balances", subaccount_id=account_id),
+                self._fetch_market_prices([m["id"] for m in self.markets.values()]),
+                self._newest_fill(account_id),
+            )
+
+        self._apply_position_snapshot(self._position_engine(account_id), *run(load()))
+
+    def _newest_fill(self, account_id):
+        return self._read("list_fills", subaccount_id=account_id, order="desc", limit=1)
+
+    def _apply_position_snapshot(self, engine: "PositionEngine", positions, balances, prices, newest_fill):
+        """
+        Loads a positions snapshot into the engine. Later fills are fetched from
+        a watermark on the server's clock: the newest fill requested alongside
+        the snapshot, or a position's updated_at if that is later. A fill landing
+        between the concurrent requests is corrected by the next resync.
+        """
+        engine.set_margin_rates({
+            m["id"]: 1 / (2 * float(m["info"]["max_leverage"])) + float(m["info"]["taker_fee"])
+            for m in self.markets.values()
+        })
+        loaded = []
         for p in positions:
-            symbol = self.market_symbol(p.product_id)
-            price = self.fetch_ticker(symbol)
+            size = abs(float(p.size)) * (1 if p.side == 0 else -1)
+            entry = float(p.cost) / abs(size) if size else 0
+            loaded.append((p.product_id, size, entry, float(p.realized_pnl), float(p.fees_accrued_usd),
+                           p.updated_at, p.model_dump()))
+        engine.load(loaded, self._collateral(balances), newest_fill[0].created_at if newest_fill else 0)
+        engine.update_prices({p.product_id: self._price_or_none(p.oracle_price) for p in prices})
+
+    def _update_position_engine(self, account_id, limit=500):
+        engine = self._position_engine(account_id)
+
+        async def update():
+            return await asyncio.gather(
+                self._read("list_fills", subaccount_id=account_id, created_after=engine.fills_after,
+                           order="asc", limit=limit),
+                self._read("get_subaccount_balances", subaccount_id=account_id),
+                self._fetch_market_prices(list(engine.product_ids)),
+            )
+
+        fills, balances, prices = run(update())
+        if len(fills) >= limit:
+            # more fills than one page since the last poll, start over from a snapshot
+            return self._load_position_engine(account_id)
+
+        engine.apply_fills(
+            (f.product_id, str(f.id), 1 if f.side == 0 else -1, float(f.price), float(f.filled), float(f.fee_usd),
+             f.created_at)
+            for f in fills)
+        engine.collateral = self._collateral(balances)
+        engine.update_prices({p.product_id: self._price_or_none(p.oracle_price) for p in prices})
+
+    def _price_or_none(self, price):
+        return float(price) if price is not None else None
+
+    def _parse_positions(self, engine: "PositionEngine", symbols=None) -> List[Position]:
+        values = engine.mark_to_market()
+        # the snapshot's own liquidation price holds until a fill moves the position
+        snapshot_fresh = not engine.is_stale(self.position_resync)
+        parsed = []
 
-            side = "buy" if float(p.size) > 0 else "sell"
-            notional = p.total_increase_notional
+        for i in engine.open_positions():
+            product_id = engine.product_ids[i]
+            symbol = self.market_symbol(product_id)
+            if symbols and symbol not in symbols:
+                continue
+
+            size = float(engine.size[i])
+            unrealised = float(values["unrealized"][i])
+            realised = float(engine.realized[i])
+            notional = float(values["notional"][i])
+            liquidation = float(values["liquidation"][i])
+            server_liquidation = engine.info.get(product_id, {}).get("liquidation_price")
+            if server_liquidation is not None and snapshot_fresh and product_id not in engine.filled_since_load:
+                liquidation = float(server_liquidation)
 
             parsed.append({
-                "info": self.extend(p.model_dump(),
-                                    {"unrealisedPnl": 0, "curRealisedPnl": p.realized_pnl, "size": p.size, "positionValue":notional}),
+                "info": self.extend(engine.info.get(product_id, {}),
+                                    {"unrealisedPnl": unrealised, "curRealisedPnl": realised, "size": size,
+                                     "positionValue": notional}),
                 "symbol": symbol,
-                "side": side,
-                "contracts": float(p.size),
-                "amount": float(p.size),
-                "entryPrice": 0,
-                "markPrice": price,
+                "side": "buy" if size > 0 else "sell",
+                "contracts": abs(size),
+                "amount": abs(size),
+                "entryPrice": float(engine.entry[i]),
+                "markPrice": float(engine.mark[i]),
                 "notional": notional,
                 "leverage": self.fetch_leverage(symbol),
-                "unrealisedPnl": 0,
+                "unrealisedPnl": unrealised,
+                "maintenanceMargin": float(values["maintenance"][i]),
                 "marginMode": "cross",
-                "liquidationPrice": 0,
-                "pnl": p.realized_pnl,
+                "liquidationPrice": liquidation or None,
+                "pnl": realised,
             })
 
-        if symbols:
-            parsed = [p for p in parsed if p["symbol"] in symbols]
-
         return parsed
 
     def fetch_position(self, symbol: str, params={}) -> Optional[Position]:
-        positions = self.fetch_positions()
+        positions = self.fetch_positions(params=params)
         for p in positions:
             if p["symbol"] == symbol:
                 return p
         return None
 
-    from datetime import datetime, timedelta
+    # -----------------------------------------------------
+    # ACCOUNT SNAPSHOT
+    # -----------------------------------------------------
+    def fetch_account_snapshot(self, symbols=None, params={}) -> Dict[str, Any]:
+        self.load_markets()
+        return run(self.fetch_account_snapshot_async(symbols, params))
+
+    async def fetch_account_snapshot_async(self, symbols=None, params={}) -> Dict[str, Any]:
+        """
+        Balance, positions, open orders and tickers fetched concurrently in one
+        round trip. Each part carries the time its response arrived, so callers
+        can bound the skew between them. Markets must be loaded.
+        """
+        started = time.monotonic()
+        ts = self.milliseconds()
+        account = self._subaccount(params)
+        fetched = {}
+
+        async def timed(part, coro):
+            result = await coro
+            fetched[part] = self.milliseconds()
+            return result
+
+        positions, newest_fill, balances, prices, working, pending = await asyncio.gather(
+            timed("positions", self._read("list_positions", subaccount_id=account.id, open=True)),
+            timed("positions", self._newest_fill(account.id)),
+            timed("balance", self._read("get_subaccount_balances", subaccount_id=account.id)),
+            timed("tickers", self._fetch_market_prices([m["id"] for m in self.markets.values()])),
+            timed("openOrders", self._read("list_orders", subaccount_id=account.id, is_working=True)),
+            timed("openOrders", self._read("list_orders", subaccount_id=account.id, is_pending=True)),
+        )
+
+        engine = self._position_engine(account.id)
+        self._apply_position_snapshot(engine, positions, balances, prices, newest_fill)
+
+        records = {}
+        for o in working + pending:
+            records[str(o.id)] = self._order_record(o)
+        tracker = self._order_tracker(account.id)
+        if tracker is not None:
+            tracker.apply_all(records.values())
+        open_orders = [r.to_ccxt() for r in records.values()]
+
+        tickers = {}
+        for price in prices:
+            symbol = self.market_symbol(price.product_id)
+            if not symbols or symbol in symbols:
+                tickers[symbol] = self._parse_ticker(symbol, price, fetched["tickers"])
+
+        return {
+            "timestamp": ts,
+            "datetime": self.iso8601(ts),
+            "latency": (time.monotonic() - started) * 1000,
+            "fetched": fetched,
+            "balance": self._parse_balance(balances),
+            "positions": self._parse_positions(engine, symbols),
+            "openOrders": [o for o in open_orders if not symbols or o["symbol"] in symbols],
+            "tickers": tickers,
+        }
 
     def _calculate_since(
             self,
@@ -379,7 +726,8 @@ class Ethereal(ccxt.Exchange):
         self.load_markets()
         market = self.markets[symbol]
 
-        rate = run(self.client.get_projected_funding(product_id=market["id"]))
+        rate = self._cached(
+            "funding_rate", market["id"], lambda: run(self._read("get_projected_funding", product_id=market["id"])))
         if not rate:
             return None
 
@@ -408,6 +756,105 @@ class Ethereal(ccxt.Exchange):
 
         return out
 
+    def fetch_funding_rate_history(self, symbol: Str = None, since: Int = None, limit: Int = None, params={}):
+        if symbol is None:
+            raise ArgumentsRequired(self.id + ' fetch_funding_rate_history() requires a symbol argument')
+        self.load_markets()
+        market = self.markets[symbol]
+        if since is None:
+            from ethereal_ccxt_adapter.funding import HOUR
+
+            since = self.milliseconds() - (limit or 24) * HOUR
+
+        run(self._sync_funding_history([market["id"]], since))
+        timestamps, rates = self._funding_store().get(market["id"], since, limit)
+
+        return [{
+            "info": {"product_id": market["id"], "created_at": int(ts), "funding_rate1h": float(rate)},
+            "symbol": symbol,
+            "fundingRate": float(rate),
+            "timestamp": int(ts),
+            "datetime": self.iso8601(int(ts)),
+        } for ts, rate in zip(timestamps, rates)]
+
+    def funding_matrix(self, symbols=None, since: Int = None, window: int = 24):
+        """
+        Funding history of several markets as one array, see funding.funding_matrix.
+        Returns (timestamps, symbols, values) with values of shape (time, market, field).
+        """
+        from ethereal_ccxt_adapter.funding import HOUR, funding_matrix
+
+        self.load_markets()
+        symbols = list(symbols or self.markets)
+        if since is None:
+            since = self.milliseconds() - 7 * 24 * HOUR
+        product_ids = [self.market_id(s) for s in symbols]
+
+        run(self._sync_funding_history(product_ids, since))
+        timestamps, values = funding_matrix([self._funding_store().get(i, since) for i in product_ids], window)
+        return timestamps, symbols, values
+
+    def _funding_store(self) -> "FundingHistory":
+        if self.funding_history is None:
+            from ethereal_ccxt_adapter.funding import FundingHistory
+
+            self.funding_history = FundingHistory()
+        return self.funding_history
+
+    async def _sync_funding_history(self, product_ids, since: int):
+        await asyncio.gather(*[self._fetch_funding_pages(i, since) for i in product_ids])
+
+    async def _fetch_funding_pages(self, product_id, since: int, page_size=100, max_pages=50):
+        """
+        Pages backwards from the newest funding record until the stored series
+        (or ``since``) is reached, and merges the new records into the store.
+        The API serves at most the last 30 days (range MONTH), older ``since``
+        values are covered by what that range holds.
+        """
+        from ethereal_ccxt_adapter.funding import HOUR
+
+        store = self._funding_store()
+        latest = store.latest(product_id)
+        stop_at = latest if latest is not None and store.covers(product_id, since) else since
+
+        now = self.milliseconds()
+        range_, range_hours = next(((r, h) for r, h in (("DAY", 24), ("WEEK", 7 * 24)) if now - since <= h * HOUR),
+                                   ("MONTH", 30 * 24))
+
+        records = []
+        cursor = None
+        exhausted = False
+        for _ in range(max_pages):
+            page = await self._read(
+                "get_validated",
+                url_path="/v1/funding",
+                request_model=self.client._models.V1FundingGetParametersQuery,
+                response_model=self.client._models.PageOfFundingDtos,
+                product_id=product_id,
+                range=range_,
+                order="desc",
+                limit=page_size,
+                cursor=cursor,
+            )
+            records.extend(page.data)
+            if not page.has_next or not page.next_cursor:
+                exhausted = True
+                break
+            if page.data and page.data[-1].created_at <= stop_at:
+                break
+            cursor = page.next_cursor
+
+        if not records and not exhausted:
+            return
+        records.reverse()
+        # an exhausted range holds every record of its time window, for a
+        # since beyond the widest range that is everything there is to fetch
+        covered_since = records[0].created_at if records else now
+        if exhausted:
+            covered_since = min(covered_since, since, now - range_hours * HOUR)
+        store.merge(product_id, [r.created_at for r in records], [float(r.funding_rate1h) for r in records],
+                    covered_since)
+
     def round_to_step(self, value, step, rounding):
         return (value / step).to_integral_value(rounding=rounding) * step
 
@@ -448,6 +895,7 @@ class Ethereal(ccxt.Exchange):
         params = params or {}
         self.load_markets()
         market = self.markets[symbol]
+        account = self._subaccount(params)
 
         # ----------------------------
         # Parse TP / SL (CCXT style)
@@ -463,6 +911,8 @@ class Ethereal(ccxt.Exchange):
             sl_price = params["sl"].get("price")
 
         reduce_only = params.get("reduceOnly", False)
+        # orders are only retried when the exchange can deduplicate them by client id
+        client_order_id = params.get("clientOrderId")
 
         if side.upper() == EOrderSide.BUY.name:
             mapped_side = 0
@@ -483,8 +933,8 @@ class Ethereal(ccxt.Exchange):
             # ----------------------------
             if tp_price is not None:
                 tp_price, amount = self.normalize_order(market, tp_price, amount, close_side)
-                order = run(self.client.create_order(
-                    subaccount=self.main_account_name,
+                order = run(self._write("create_order", client_order_id is not None,
+                    subaccount=account.name,
                     sender=self.walletAddress,
                     product_id=market["id"],
                     side=close_side,
@@ -493,6 +943,7 @@ class Ethereal(ccxt.Exchange):
                     stop_price=tp_price,
                     stop_type=0,
                     reduce_only=True,
+                    client_order_id=client_order_id,
                 ))
 
             # ----------------------------
@@ -500,8 +951,8 @@ class Ethereal(ccxt.Exchange):
             # ----------------------------
             elif sl_price is not None:
                 sl_price, amount = self.normalize_order(market, sl_price, amount, close_side)
-                order = run(self.client.create_order(
-                    subaccount=self.main_account_name,
+                order = run(self._write("create_order", client_order_id is not None,
+                    subaccount=account.name,
                     sender=self.walletAddress,
                     product_id=market["id"],
                     side=close_side,
@@ -510,14 +961,15 @@ class Ethereal(ccxt.Exchange):
                     stop_price= sl_price,
                     stop_type=1,
                     reduce_only=True,
+                    client_order_id=client_order_id,
                 ))
             else:
                 # ----------------------------
                 # Create MAIN order
                 # ----------------------------
                 price, amount = self.normalize_order(market, price, amount, side)
-                order = run(self.client.create_order(
-                    subaccount=self.main_account_name,
+                order = run(self._write("create_order", client_order_id is not None,
+                    subaccount=account.name,
                     sender=self.walletAddress,
                     product_id=market["id"],
                     side=mapped_side,
@@ -525,11 +977,15 @@ class Ethereal(ccxt.Exchange):
                     quantity=amount,
                     price= price,
                     reduce_only=reduce_only,
+                    client_order_id=client_order_id,
                 ))
+        except NetworkError:
+            raise
         except Exception as e:
             print(f"error occured: {e}")
             raise InvalidOrder(self.id + ' ' + str(e))
-            return None
+        finally:
+            self._invalidate_account_cache(account.id)
 
         if order.filled == amount:
             status = EOrderStatus.FILLED
@@ -538,11 +994,11 @@ class Ethereal(ccxt.Exchange):
 
         fee = float(self.fees["swap"]["taker"]) * float(amount) * float(price)
 
-        return {
+        result = {
             "info": order,
-            "id": order.id,
+            "id": str(order.id),
             'order': id,
-            'clientOrderId': id,
+            'clientOrderId': client_order_id,
             'timestamp': self.iso8601(int(time.time() * 1000)),
             'datetime': self.iso8601(int(time.time() * 1000)),
             "symbol": symbol,
@@ -569,74 +1025,116 @@ class Ethereal(ccxt.Exchange):
             "status": status,
             'reduceOnly': params.get('reduceOnly', False) if params is not None else True,
         }
+        tracker = self._order_tracker(account.id)
+        if tracker is not None:
+            tracker.apply(OrderRecord(str(order.id), symbol, EOrderSide.BUY if mapped_side == 0 else EOrderSide.SELL,
+                                      type.lower(), price, amount, order.filled, status, order))
+        return result
 
     def cancel_order(self, id: str, symbol=None, params={}) -> Order:
+        account = self._subaccount(params)
         try:
-            run(self.client.cancel_orders(subaccount=self.main_account_name, sender=self.walletAddress, order_ids=[id]))
-        except Exception:
-            raise OrderNotFound(id)
-
+            # cancelling is idempotent, a retry after a lost response is harmless
+            run(self._write("cancel_orders", True, OrderNotFound,
+                            subaccount=account.name, sender=self.walletAddress, order_ids=[id]))
+        finally:
+            self._invalidate_account_cache(account.id)
+
+        tracker = self._order_tracker(account.id)
+        if tracker is not None:
+            tracker.set_status(id, EOrderStatus.CANCELED)
         return {"id": id, "status": "canceled"}
 
     def cancel_all_orders(self, symbol=None, params={}):
-        orders = self.fetch_orders(symbol)
+        orders = self.fetch_orders(symbol, params=params)
         for o in orders:
-            self.cancel_order(o["id"], o["symbol"])
+            self.cancel_order(o["id"], o["symbol"], params)
 
     def fetch_orders(self, symbol: str = None, since: Int = None, limit: Int = None, params={}) -> List[Order]:
-        orders = run(self.client.list_orders(subaccount_id=self.main_account_id))
-        parsed = []
+        account = self._subaccount(params)
+        orders = self._cached(
+            "orders", account.id, lambda: run(self._read("list_orders", subaccount_id=account.id)))
+        records = [self._order_record(o) for o in orders]
 
-        for o in orders:
-            sym = self.market_symbol(o.product_id)
+        tracker = self._order_tracker(account.id)
+        if tracker is not None:
+            tracker.apply_all(records)
+            tracker.mark_synced()
 
-            parsed.append({
-                "id": str(o.id),
-                "symbol": sym,
-                "side": EOrderSide.BUY if o.side == 0 else EOrderSide.SELL,
-                "type": str(o.type).lower(),
-                "price": float(o.price),
-                "amount": float(o.quantity),
-                "filled": float(o.filled),
-                "status": EOrderStatus.valueOf(str(o.status.value).lower()),
-                "info": o.model_dump(),
-            })
+        parsed = [r.to_ccxt() for r in records]
 
         if symbol:
             parsed = [o for o in parsed if o["symbol"] == symbol]
 
         return parsed
 
+    def fetch_open_orders(self, symbol: Str = None, since: Int = None, limit: Int = None, params={}) -> List[Order]:
+        account = self._subaccount(params)
+        tracker = self._order_tracker(account.id)
+        if tracker is not None:
+            self._sync_order_tracker(account.id, self.safe_number(params, 'maxStaleness'))
+            return tracker.open_orders(symbol)
+        return [o for o in self.fetch_orders(symbol, params=params) if o["status"] in OPEN_STATUSES]
+
     def fetch_order(self, order_id, symbol=None, params=None):
+        params = params or {}
+        account = self._subaccount(params)
+        tracker = self._order_tracker(account.id)
+        if tracker is not None and order_id is not None:
+            self._sync_order_tracker(account.id, self.safe_number(params, 'maxStaleness'))
+            order = tracker.get(order_id)
+            if order is not None:
+                return order
         if order_id is not None:
             try:
-                return self._parse_order(run(self.client.get_order(id=UUID(str(order_id)))))
-            except Exception as e:
-                if "Order not found" in str(e):
-                    raise OrderNotFound(order_id)
-                raise OrderNotFound(str(e))
-        orders = self.fetch_orders(symbol)
+                uuid = UUID(str(order_id))
+            except ValueError:
+                raise OrderNotFound(order_id)
+            dto = run(self._read("get_order", OrderNotFound, id=uuid))
+            record = self._order_record(dto)
+            tracker = self._order_tracker(dto.subaccount_id)
+            if tracker is not None:
+                tracker.apply(record)
+            return record.to_ccxt()
+        orders = self.fetch_orders(symbol, params=params)
         for o in orders:
             if o["id"] == order_id:
-                return self._parse_order(o)
+                return o
         raise OrderNotFound(order_id)
 
-    def _parse_order(self, order):
-        return {
-            "id": order.id,
-            "symbol": order.symbol,
-            "status": order.status,
-            "type": order.type,
-            "side": order.side,
-            "price": float(order.price or 0),
-            "amount": float(order.quantity or 0),
-            "filled": float(order.filled or 0),
-            "remaining": float(order.remaining or 0),
-            "info": order.to_dict(),
-        }
+    def _sync_order_tracker(self, account_id, max_staleness=None):
+        """
+        Seeds the order tracker from the full order list on first use, afterwards
+        only polls the working orders and resolves the ones that left that set.
+        """
+        tracker = self._order_tracker(account_id)
+        if not tracker.is_stale(max_staleness):
+            return
+        if tracker.synced_at is None:
+            self.fetch_orders(params={"subaccount": str(account_id)})
+            return
+
+        async def poll():
+            working, pending = await asyncio.gather(
+                self._read("list_orders", subaccount_id=account_id, is_working=True),
+                self._read("list_orders", subaccount_id=account_id, is_pending=True),
+            )
+            seen = {str(o.id) for o in working} | {str(o.id) for o in pending}
+            gone = [i for i in tracker.open_order_ids() if i not in seen]
+            resolved = await asyncio.gather(*[self._read("get_order", id=UUID(i)) for i in gone],
+                                            return_exceptions=True)
+            return working + pending + [o for o in resolved if not isinstance(o, Exception)]
+
+        tracker.apply_all(self._order_record(o) for o in run(poll()))
+        tracker.mark_synced()
+
+    def _order_record(self, order) -> OrderRecord:
+        return OrderRecord.from_dto(order, self.market_symbol(order.product_id))
 
     def fetch_leverage(self, symbol: str, params={}):
-        return 10
+        # margin is cross and sized by the market's max leverage
+        self.load_markets()
+        return self.markets[symbol]["info"]["max_leverage"]
 
     def fetch_margin_mode(self, symbol: str, params={}):
         return "cross"
@@ -645,4 +1143,7 @@ class Ethereal(ccxt.Exchange):
         return None
 
     def close(self):
-        return run(self.client.close())
+        result = run(self.client.close())
+        if self.cassette is not None and self.record_to is not None:
+            self.cassette.save()
+        return result
@@ -0,0 +1,28 @@
+# exports are resolved on first access, so importing the package (e.g. for
+# the enums in const) does not pull in ccxt and the SDK. The Ethereal class is
+# imported from its submodule, which shares the name of the package attribute.
+_EXPORTS = {
+    "EOrderSide": "ethereal_ccxt_adapter.const",
+    "EOrderStatus": "ethereal_ccxt_adapter.const",
+    "EOrderType": "ethereal_ccxt_adapter.const",
+    "RequestPolicy": "ethereal_ccxt_adapter.policy",
+    "MarketDataRecorder": "ethereal_ccxt_adapter.recorder",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# seconds, 0 disables caching for the endpoint
+DEFAULT_TTL = {
+    "ticker": 1.0,
+    "funding_rate": 10.0,
+    "balance": 2.0,
+    "positions": 2.0,
+    "orders": 1.0,
+}
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL cache for read endpoints with bounded LRU eviction.
+
+    Concurrent callers asking for the same key share one in-flight load
+    (singleflight): the first caller runs the loader, the others wait for its
+    result instead of sending their own request. A caller running inside an
+    event loop (nested via nest_asyncio) loads on its own instead, blocking
+    that thread could stall the loop the leader's load runs on.
+    """
+
+    def __init__(self, ttl: Optional[Dict[str, float]] = None, max_size: int = 1024):
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, endpoint: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        ttl = self.ttl.get(endpoint, 0)
+        if not ttl:
+            return loader()
+
+        cache_key = (endpoint, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                return entry[1]
+
+            future = self._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[cache_key] = future
+
+        if not leader:
+            if _loop_running():
+                return loader()
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # an invalidation during the load dropped the in-flight marker,
+            # the result is handed to the waiters but not stored
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+                self._entries[cache_key] = (time.monotonic() + ttl, value)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, endpoint: str, key: Hashable = None):
+        """Drops the entry for ``key``, or every entry of ``endpoint`` if no key is given."""
+        with self._lock:
+            if key is not None:
+                self._entries.pop((endpoint, key), None)
+                self._inflight.pop((endpoint, key), None)
+                return
+            for cache_key in [k for k in self._entries if k[0] == endpoint]:
+                del self._entries[cache_key]
+            for cache_key in [k for k in self._inflight if k[0] == endpoint]:
+                del self._inflight[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
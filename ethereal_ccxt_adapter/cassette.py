@@ -0,0 +1,272 @@
+import asyncio
+import gzip
+import json
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+# ---------------------------------------------------------
+# Cassette
+# ---------------------------------------------------------
+def _interaction_key(method: str, path: str, query: str) -> str:
+    # query parameters are sorted so that replay does not depend on the
+    # order in which the SDK serializes them
+    query = "&".join(sorted(p for p in query.split("&") if p))
+    return f"{method.upper()} {path}?{query}"
+
+
+class Cassette:
+    """
+    Recorded HTTP interactions of the SDK client.
+
+    Each interaction is stored as one compact JSON line (gzip compressed when
+    the path ends with ``.gz``) with the keys
+
+    m: method, p: path, q: query, b: request body, s: status code,
+    c: content type, r: response body, t: offset since recording start (s),
+    d: request duration (s)
+    """
+
+    def __init__(self, path: Optional[str] = None, interactions: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = interactions or []
+        self._started = time.monotonic()
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        for interaction in self.interactions:
+            self._add_to_index(interaction)
+
+    def _add_to_index(self, interaction):
+        key = _interaction_key(interaction["m"], interaction["p"], interaction["q"])
+        self._index.setdefault(key, []).append(interaction)
+
+    def record(self, request: httpx.Request, status: int, content_type: Optional[str], content: bytes,
+               started: float, duration: float):
+        interaction = {
+            "m": request.method,
+            "p": request.url.path,
+            "q": request.url.query.decode(),
+            "b": request.content.decode() if request.content else None,
+            "s": status,
+            "c": content_type,
+            "r": content.decode(),
+            "t": round(started - self._started, 6),
+            "d": round(duration, 6),
+        }
+        self.interactions.append(interaction)
+        self._add_to_index(interaction)
+
+    def match(self, method: str, path: str, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the next recorded interaction for the request. Requests that are
+        issued more often than they were recorded cycle through the recordings,
+        so a short cassette can drive a long load test.
+        """
+        key = _interaction_key(method, path, query)
+        recorded = self._index.get(key)
+        if not recorded:
+            return None
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        return recorded[cursor % len(recorded)]
+
+    def rewind(self):
+        self._cursors.clear()
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if path is None:
+            raise ValueError("cassette path required")
+        lines = "".join(json.dumps(i, separators=(",", ":")) + "\n" for i in self.interactions)
+        if path.endswith(".gz"):
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.write(lines)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(lines)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            interactions = [json.loads(line) for line in f if line.strip()]
+        return cls(path, interactions)
+
+
+def _replay_delay(interaction: Dict[str, Any], speed: Optional[float]) -> float:
+    # speed 1.0 replays the recorded latency, 2.0 halves it, None/0 replays
+    # as fast as possible
+    if not speed:
+        return 0
+    return interaction["d"] / speed
+
+
+# ---------------------------------------------------------
+# Transports
+# ---------------------------------------------------------
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards requests to the network and records them into a cassette."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        try:
+            # decoded body, so the content-encoding header is not forwarded
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        duration = time.monotonic() - started
+
+        content_type = response.headers.get("content-type")
+        self.cassette.record(request, response.status_code, content_type, content, started, duration)
+
+        headers = {"content-type": content_type} if content_type else {}
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves requests from a cassette without touching the network."""
+
+    def __init__(self, cassette: Cassette, speed: Optional[float] = 1.0):
+        self.cassette = cassette
+        self.speed = speed
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self.cassette.match(request.method, request.url.path, request.url.query.decode())
+        if interaction is None:
+            return httpx.Response(404, json={"message": f"no recording for {request.method} {request.url}"},
+                                  request=request)
+
+        delay = _replay_delay(interaction, self.speed)
+        if delay:
+            await asyncio.sleep(delay)
+
+        headers = {"content-type": interaction["c"]} if interaction["c"] else {}
+        return httpx.Response(interaction["s"], headers=headers, content=interaction["r"].encode(), request=request)
+
+
+def offline_chain_client(chain_config: Dict[str, Any], rpc_config):
+    """
+    SDK ChainClient for replay. Signing only needs the private key and the
+    EIP-712 domain of the (replayed) rpc config, but the client asks the RPC
+    node for the chain id on construction, outside the httpx session. That
+    request is answered locally from the domain instead.
+    """
+    from ethereal.chain_client import ChainClient
+    from web3 import Web3
+    from web3.providers.base import BaseProvider
+
+    chain_id = int(rpc_config.domain.chain_id)
+
+    class ChainIdProvider(BaseProvider):
+        def make_request(self, method, params):
+            if method != "eth_chainId":
+                raise RuntimeError(f"{method} is not available during replay")
+            return {"jsonrpc": "2.0", "id": 0, "result": hex(chain_id)}
+
+        def is_connected(self, show_traceback: bool = False) -> bool:
+            return True
+
+    class OfflineChainClient(ChainClient):
+        def _setup_provider(self):
+            return Web3(ChainIdProvider())
+
+    return OfflineChainClient(chain_config, rpc_config)
+
+
+# ---------------------------------------------------------
+# Local stand-in server
+# ---------------------------------------------------------
+class CassetteServer:
+    """
+    Minimal HTTP/1.1 server replaying a cassette on a local port, for load
+    tests that drive the adapter over real sockets. Point the adapter at it
+    with ``Ethereal({'base_url': server.url, 'offline_chain': True, ...})``
+    to also sign without the RPC node.
+    """
+
+    def __init__(self, cassette: Cassette, host: str = "127.0.0.1", port: int = 0, speed: Optional[float] = 1.0):
+        self.cassette = cassette
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length:
+                    await reader.readexactly(length)
+
+                url = urlsplit(target)
+                interaction = self.cassette.match(method, url.path, url.query)
+                if interaction is None:
+                    status, content_type, body = 404, "application/json", b'{"message":"no recording"}'
+                else:
+                    delay = _replay_delay(interaction, self.speed)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    status, content_type, body = interaction["s"], interaction["c"], interaction["r"].encode()
+
+                head = f"HTTP/1.1 {status} {httpx.codes.get_reason_phrase(status)}\r\n" \
+                       f"Content-Length: {len(body)}\r\n"
+                if content_type:
+                    head += f"Content-Type: {content_type}\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + body)
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def serve(path: str, host: str = "127.0.0.1", port: int = 8080, speed: Optional[float] = 1.0):
+    """Blocking helper to replay a cassette file on ``host:port``, runs until interrupted."""
+    server = CassetteServer(Cassette.load(path), host, port, speed)
+    asyncio.run(server.serve_forever())
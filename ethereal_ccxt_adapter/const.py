@@ -24,6 +24,7 @@ class EOrderStatus(str, Enum):
     REJECTED = "rejected"
     OPEN = "open"
     CANCELED = "canceled"
+    EXPIRED = "expired"
     REDUCE_ONLY_CANCELED = "reduceOnlyCanceled"
 
     @classmethod
@@ -32,6 +33,8 @@ class EOrderStatus(str, Enum):
             return EOrderStatus.OPEN
         if value == "pending":
             return EOrderStatus.OPEN
+        if value == "filled_partial":
+            return EOrderStatus.PARTIALLY_FILLED
         for k, v in cls.__members__.items():
             if v == value:
                 return v
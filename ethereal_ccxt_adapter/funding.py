@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HOUR = 3600 * 1000
+HOURS_PER_YEAR = 24 * 365
+
+# field columns of the funding matrix
+RATE, ANNUALIZED, ROLLING_MEAN, RANK = range(4)
+FIELDS = ("rate", "annualized", "rollingMean", "rank")
+
+
+class FundingHistory:
+    """
+    Local store of hourly funding rates per product as sorted timestamp/rate
+    arrays. ``covered_since`` marks how far back a product's series is known
+    to be complete, so later requests only fetch the newer records.
+    """
+
+    def __init__(self):
+        self._series: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+        self._covered_since: Dict[Any, int] = {}
+
+    def latest(self, product_id) -> Optional[int]:
+        series = self._series.get(product_id)
+        if series is None or not len(series[0]):
+            return None
+        return int(series[0][-1])
+
+    def covers(self, product_id, since: int) -> bool:
+        covered = self._covered_since.get(product_id)
+        return covered is not None and since >= covered
+
+    def merge(self, product_id, timestamps: Sequence[int], rates: Sequence[float], covered_since: int):
+        """
+        Adds a contiguous block of records reaching back to ``covered_since``.
+        A block that does not overlap the stored series replaces it.
+        """
+        ts = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(rates, dtype=np.float64)
+        latest = self.latest(product_id)
+        if latest is not None and covered_since <= latest:
+            old_ts, old_values = self._series[product_id]
+            ts = np.concatenate((old_ts, ts))
+            values = np.concatenate((old_values, values))
+            covered_since = min(covered_since, self._covered_since[product_id])
+        ts, first = np.unique(ts, return_index=True)
+        self._series[product_id] = (ts, values[first])
+        self._covered_since[product_id] = covered_since
+
+    def get(self, product_id, since: Optional[int] = None, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        ts, values = self._series.get(product_id, (np.zeros(0, dtype=np.int64), np.zeros(0)))
+        if since is not None:
+            lo = np.searchsorted(ts, since, side="left")
+            ts, values = ts[lo:], values[lo:]
+        if limit is not None:
+            ts, values = ts[:limit], values[:limit]
+        return ts, values
+
+
+def funding_matrix(series: List[Tuple[np.ndarray, np.ndarray]], window: int = 24) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aligns per-market (timestamps, rates) series on an hourly grid and returns
+    (timestamps, values) with values of shape (time, market, field): the
+    hourly rate, the annualized rate, its rolling mean over ``window`` hours
+    and the rank across markets (1 = highest annualized rate). Missing hours
+    are NaN.
+    """
+    if not series or not any(len(ts) for ts, _ in series):
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(series), len(FIELDS)))
+
+    hours = [ts // HOUR for ts, _ in series]
+    start = min(int(h[0]) for h in hours if len(h))
+    end = max(int(h[-1]) for h in hours if len(h))
+    timestamps = np.arange(start, end + 1, dtype=np.int64) * HOUR
+
+    rate = np.full((len(timestamps), len(series)), np.nan)
+    for m, (h, (_, values)) in enumerate(zip(hours, series)):
+        rate[h - start, m] = values
+
+    annualized = rate * HOURS_PER_YEAR
+
+    # nan-aware rolling mean via cumulative sums
+    valid = ~np.isnan(annualized)
+    sums = np.cumsum(np.where(valid, annualized, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling = np.where(counts > 0, sums / counts, np.nan)
+
+    order = np.argsort(np.where(valid, -annualized, np.inf), axis=1, kind="stable")
+    rank = np.empty_like(annualized)
+    np.put_along_axis(rank, order, np.arange(1, len(series) + 1, dtype=np.float64)[None, :].repeat(len(rate), 0), 1)
+    rank[~valid] = np.nan
+
+    return timestamps, np.stack((rate, annualized, rolling, rank), axis=2)
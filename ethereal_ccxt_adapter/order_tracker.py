@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from ethereal_ccxt_adapter.const import EOrderStatus
+from ethereal_ccxt_adapter.records import OrderRecord
+
+OPEN_STATUSES = (EOrderStatus.OPEN, EOrderStatus.PARTIALLY_FILLED)
+
+
+class OrderTracker:
+    """
+    In-memory order book of the subaccount, keyed by order id.
+
+    Orders are kept as compact ``OrderRecord``s indexed by symbol and status, so
+    open orders per symbol and single orders are local lookups. Lookups return
+    CCXT dicts built from the records. The adapter seeds it from ``list_orders``, applies the
+    responses of its own writes and reconciles it by polling the working
+    orders once the snapshot is older than ``max_staleness`` seconds.
+
+    Closed orders (filled, canceled, expired, rejected) are kept for lookups
+    up to ``max_closed``, the ones that closed first are evicted beyond that.
+    """
+
+    def __init__(self, max_staleness: float = 2.0, max_closed: int = 1000):
+        self.max_staleness = max_staleness
+        self.max_closed = max_closed
+        self.synced_at: Optional[float] = None
+        self._orders: Dict[str, OrderRecord] = {}
+        self._by_symbol: Dict[str, Dict[str, OrderRecord]] = {}
+        self._by_status: Dict[str, Dict[str, OrderRecord]] = {}
+        self._open_by_symbol: Dict[str, Dict[str, OrderRecord]] = {}
+        # ids of closed orders, oldest first
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return str(order_id) in self._orders
+
+    # -----------------------------------------------------
+    # Updates
+    # -----------------------------------------------------
+    def apply(self, order: OrderRecord):
+        """Inserts or replaces an order, e.g. from a poll, a write response or a websocket update."""
+        order_id = order.id
+        with self._lock:
+            self._unindex(order_id)
+            self._orders[order_id] = order
+            self._by_symbol.setdefault(order.symbol, {})[order_id] = order
+            self._by_status.setdefault(str(order.status), {})[order_id] = order
+            if order.status in OPEN_STATUSES:
+                self._open_by_symbol.setdefault(order.symbol, {})[order_id] = order
+                self._closed.pop(order_id, None)
+            elif order_id not in self._closed:
+                self._closed[order_id] = None
+                while len(self._closed) > self.max_closed:
+                    self.remove(next(iter(self._closed)))
+
+    def apply_all(self, orders: Iterable[OrderRecord]):
+        with self._lock:
+            for order in orders:
+                self.apply(order)
+
+    def set_status(self, order_id, status: EOrderStatus):
+        with self._lock:
+            order = self._orders.get(str(order_id))
+            if order is not None:
+                self.apply(order.with_status(status))
+
+    def remove(self, order_id):
+        with self._lock:
+            self._unindex(str(order_id))
+            self._orders.pop(str(order_id), None)
+            self._closed.pop(str(order_id), None)
+
+    def _unindex(self, order_id: str):
+        previous = self._orders.get(order_id)
+        if previous is None:
+            return
+        self._by_symbol.get(previous.symbol, {}).pop(order_id, None)
+        self._by_status.get(str(previous.status), {}).pop(order_id, None)
+        self._open_by_symbol.get(previous.symbol, {}).pop(order_id, None)
+
+    def mark_synced(self):
+        self.synced_at = time.monotonic()
+
+    def is_stale(self, max_staleness: Optional[float] = None) -> bool:
+        if self.synced_at is None:
+            return True
+        if max_staleness is None:
+            max_staleness = self.max_staleness
+        return time.monotonic() - self.synced_at > max_staleness
+
+    # -----------------------------------------------------
+    # Lookups
+    # -----------------------------------------------------
+    def get(self, order_id) -> Optional[dict]:
+        order = self._orders.get(str(order_id))
+        return order.to_ccxt() if order is not None else None
+
+    def by_status(self, status, symbol: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            orders = self._by_status.get(str(status), {}).values()
+            return [o.to_ccxt() for o in orders if symbol is None or o.symbol == symbol]
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            if symbol is None:
+                return [o.to_ccxt() for orders in self._open_by_symbol.values() for o in orders.values()]
+            return [o.to_ccxt() for o in self._open_by_symbol.get(symbol, {}).values()]
+
+    def open_order_ids(self) -> List[str]:
+        with self._lock:
+            return [i for orders in self._open_by_symbol.values() for i in orders]
@@ -0,0 +1,159 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Type
+
+from ccxt import (
+    AuthenticationError,
+    BadRequest,
+    BaseError,
+    ExchangeError,
+    ExchangeNotAvailable,
+    NetworkError,
+    RateLimitExceeded,
+    RequestTimeout,
+)
+
+# absolute time.monotonic() deadline of the current call, see RequestPolicy.deadline
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("ethereal_deadline", default=None)
+
+
+def map_exception(e: Exception, not_found: Optional[Type[BaseError]] = None) -> BaseError:
+    """Translates SDK / transport exceptions into the matching ccxt error."""
+    if isinstance(e, BaseError):
+        return e
+    import httpx
+
+    if isinstance(e, httpx.TimeoutException):
+        return RequestTimeout(str(e))
+    if isinstance(e, httpx.TransportError):
+        return NetworkError(str(e))
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        if status == 429:
+            error = RateLimitExceeded(str(e))
+            error.retry_after = e.response.headers.get("retry-after")
+            return error
+        if status == 404 and not_found is not None:
+            return not_found(str(e))
+        if status in (401, 403):
+            return AuthenticationError(str(e))
+        if status >= 500:
+            return ExchangeNotAvailable(str(e))
+        return BadRequest(str(e))
+    if "not found" in str(e).lower() and not_found is not None:
+        return not_found(str(e))
+    return ExchangeError(str(e))
+
+
+class RequestPolicy:
+    """
+    Retry, hedging and deadline handling for SDK calls.
+
+    - idempotent calls are retried on network errors (timeouts, 5xx, 429)
+      with full-jitter exponential backoff, honouring Retry-After
+    - with ``hedge`` a read (``call(..., hedge=True)``) whose first attempt
+      is slower than the endpoint's observed ``hedge_quantile`` latency gets a
+      duplicate request, the first response wins. Writes are never hedged,
+      idempotent ones are only retried one request at a time
+    - ``deadline`` (seconds, or per call via ``with policy.deadline(s)``)
+      bounds the whole call including retries, exceeding it raises
+      RequestTimeout
+    """
+
+    def __init__(self, retries: int = 2, backoff: float = 0.1, max_backoff: float = 2.0, hedge: bool = False,
+                 hedge_quantile: float = 0.95, hedge_min_samples: int = 20, deadline: Optional[float] = None,
+                 window: int = 200):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.default_deadline = deadline
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    @contextmanager
+    def deadline(self, seconds: float):
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        samples = self._latencies.get(name)
+        if samples is None or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))]
+
+    async def call(self, name: str, factory: Callable[[], Awaitable[Any]], idempotent: bool = True,
+                   not_found: Optional[Type[BaseError]] = None, hedge: bool = False) -> Any:
+        deadline = _deadline.get()
+        if deadline is None and self.default_deadline is not None:
+            deadline = time.monotonic() + self.default_deadline
+
+        attempt = 0
+        while True:
+            try:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise RequestTimeout(f"{name} deadline exceeded")
+                try:
+                    return await asyncio.wait_for(self._attempt(name, factory, hedge), remaining)
+                except asyncio.TimeoutError:
+                    raise RequestTimeout(f"{name} deadline exceeded")
+            except Exception as e:
+                error = map_exception(e, not_found)
+                if not idempotent or not isinstance(error, NetworkError) or attempt >= self.retries:
+                    raise error from e
+
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after is not None:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _timed(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        result = await factory()
+        samples = self._latencies.get(name)
+        if samples is None:
+            samples = self._latencies.setdefault(name, deque(maxlen=self.window))
+        samples.append(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, name: str, factory: Callable[[], Awaitable[Any]], hedge: bool) -> Any:
+        delay = self.hedge_delay(name) if self.hedge and hedge else None
+        if delay is None:
+            return await self._timed(name, factory)
+
+        first = asyncio.ensure_future(self._timed(name, factory))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.add(asyncio.ensure_future(self._timed(name, factory)))
+            error = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
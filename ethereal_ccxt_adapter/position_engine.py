@@ -0,0 +1,160 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class PositionEngine:
+    """
+    Per-market position state of a subaccount, stored column-wise.
+
+    The state is seeded from ``list_positions`` and then advanced by folding
+    fills (average entry, realized PnL, fees) one at a time. Mark-to-market is
+    computed for all markets at once from the latest prices, so PnL can be
+    refreshed from a price update alone.
+
+    Liquidation prices are a cross-margin estimate: the price of one market at
+    which equity reaches the maintenance margin while all other markets stay
+    at their mark.
+    """
+
+    def __init__(self):
+        self.product_ids: List[Any] = []
+        self._index: Dict[Any, int] = {}
+        self.size = np.zeros(0)
+        self.entry = np.zeros(0)
+        self.realized = np.zeros(0)
+        self.fees = np.zeros(0)
+        self.mark = np.zeros(0)
+        self.mmr = np.zeros(0)
+        self.info: Dict[Any, dict] = {}
+        self.collateral = 0.0
+        self.fills_after: Optional[int] = None
+        self.synced_at: Optional[float] = None
+        # products whose position moved by a fill since the snapshot
+        self.filled_since_load: Set[Any] = set()
+        # fill ids applied at the watermark timestamp, None if the snapshot
+        # already covers every fill at that timestamp
+        self._fills_at_watermark: Optional[Set[str]] = None
+
+    def _slot(self, product_id) -> int:
+        i = self._index.get(product_id)
+        if i is None:
+            i = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self._index[product_id] = i
+            self.size, self.entry, self.realized, self.fees, self.mark, self.mmr = (
+                np.append(a, 0.0) for a in (self.size, self.entry, self.realized, self.fees, self.mark, self.mmr))
+        return i
+
+    def is_stale(self, max_age: float) -> bool:
+        return self.synced_at is None or time.monotonic() - self.synced_at > max_age
+
+    # -----------------------------------------------------
+    # Updates
+    # -----------------------------------------------------
+    def load(self, positions: Iterable[Tuple[Any, float, float, float, float, int, dict]], collateral: float,
+             fills_after: int):
+        """
+        Replaces the state with a positions snapshot of
+        (product_id, signed size, entry price, realized pnl, fees, updated_at, info) tuples.
+        ``fills_after`` is the server timestamp of the newest fill the snapshot
+        reflects, fills up to it (or a later updated_at) are not applied again.
+        """
+        self.size[:] = 0
+        self.entry[:] = 0
+        self.realized[:] = 0
+        self.fees[:] = 0
+        self.info.clear()
+        for product_id, size, entry, realized, fees, updated_at, info in positions:
+            i = self._slot(product_id)
+            self.size[i] = size
+            self.entry[i] = entry
+            self.realized[i] = realized
+            self.fees[i] = fees
+            self.info[product_id] = info
+            fills_after = max(fills_after, updated_at)
+        self.collateral = collateral
+        self.fills_after = fills_after
+        self._fills_at_watermark = None
+        self.filled_since_load.clear()
+        self.synced_at = time.monotonic()
+
+    def apply_fill(self, product_id, fill_id: str, side: int, price: float, quantity: float, fee: float,
+                   created_at: int):
+        """Folds one fill into the market's position, side is +1 for buys and -1 for sells."""
+        if self.fills_after is not None:
+            if created_at < self.fills_after:
+                return
+            if created_at == self.fills_after and (
+                    self._fills_at_watermark is None or fill_id in self._fills_at_watermark):
+                return
+        if self.fills_after is None or created_at > self.fills_after:
+            self.fills_after = created_at
+            self._fills_at_watermark = set()
+        self._fills_at_watermark.add(fill_id)
+        self.filled_since_load.add(product_id)
+
+        i = self._slot(product_id)
+        size = float(self.size[i])
+        entry = float(self.entry[i])
+
+        if size == 0 or (size > 0) == (side > 0):
+            if size == 0:
+                self.realized[i] = 0
+                self.fees[i] = 0
+            entry = (entry * abs(size) + price * quantity) / (abs(size) + quantity)
+        else:
+            closed = min(abs(size), quantity)
+            self.realized[i] += closed * (price - entry) * (1 if size > 0 else -1)
+            if quantity > closed:
+                entry = price
+            elif closed == abs(size):
+                entry = 0
+
+        self.size[i] = size + side * quantity
+        self.entry[i] = entry
+        self.fees[i] += fee
+
+    def apply_fills(self, fills: Iterable[Tuple[Any, str, int, float, float, float, int]]):
+        for fill in sorted(fills, key=lambda f: f[6]):
+            self.apply_fill(*fill)
+
+    def set_margin_rates(self, rates: Dict[Any, float]):
+        for product_id, rate in rates.items():
+            i = self._slot(product_id)
+            self.mmr[i] = rate
+
+    def update_prices(self, prices: Dict[Any, float]):
+        for product_id, price in prices.items():
+            i = self._index.get(product_id)
+            if i is not None and price is not None:
+                self.mark[i] = price
+
+    # -----------------------------------------------------
+    # Mark to market
+    # -----------------------------------------------------
+    def mark_to_market(self) -> Dict[str, np.ndarray]:
+        size, mark = self.size, self.mark
+        unrealized = size * (mark - self.entry)
+        notional = np.abs(size) * mark
+        maintenance = notional * self.mmr
+        equity = self.collateral + unrealized.sum()
+
+        # equity(p) = maintenance(p) for market i, all other markets held at mark
+        other_maintenance = maintenance.sum() - maintenance
+        denominator = size - np.abs(size) * self.mmr
+        with np.errstate(divide="ignore", invalid="ignore"):
+            liquidation = (other_maintenance - equity + size * mark) / denominator
+        liquidation = np.where((size != 0) & (liquidation > 0), liquidation, 0.0)
+
+        return {
+            "unrealized": unrealized,
+            "notional": notional,
+            "maintenance": maintenance,
+            "liquidation": liquidation,
+            "equity": equity,
+        }
+
+    def open_positions(self) -> List[int]:
+        return [int(i) for i in np.flatnonzero(self.size)]
@@ -0,0 +1,142 @@
+import asyncio
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from ethereal_ccxt_adapter.Ethereal import Ethereal, run
+
+# field rows of the sample buffer
+TIMESTAMP, BID, ASK, ORACLE = range(4)
+FIELDS = ("timestamp", "bid", "ask", "oracle")
+
+
+class MarketDataRecorder:
+    """
+    Continuous price capture for all (or the given) markets into preallocated
+    per-market ring buffers.
+
+    Every ``interval`` seconds one batched ``list_market_prices`` request is
+    issued and its values are written straight into a float64 array of shape
+    (4, markets, capacity) holding timestamp (ms), bid, ask and oracle price.
+    With ``path`` the array is a memory-mapped ``.npy`` file instead of RAM.
+
+    ``run()`` has to be awaited on the event loop the adapter's requests run
+    on (the SDK's HTTP session is bound to it), ``stop()`` ends it. Sync
+    callers use ``record(seconds)``, which blocks while recording. Failed
+    samples are not recorded, they are counted in ``failures`` and the last
+    exception is kept in ``last_error``.
+    """
+
+    def __init__(self, exchange: Ethereal, interval: float = 1.0, capacity: int = 86400,
+                 symbols: Optional[List[str]] = None, path: Optional[str] = None):
+        exchange.load_markets()
+        self.exchange = exchange
+        self.interval = interval
+        self.capacity = capacity
+        self.symbols = list(symbols or exchange.markets)
+        self.product_ids = [exchange.market_id(s) for s in self.symbols]
+        self._index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        shape = (len(FIELDS), len(self.symbols), capacity)
+        if path is not None:
+            self.data = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+            self.data[:] = np.nan
+        else:
+            self.data = np.full(shape, np.nan)
+        self.counts = np.zeros(len(self.symbols), dtype=np.int64)
+
+        self.failures = 0
+        self.last_error: Optional[Exception] = None
+        self._running = False
+
+    # -----------------------------------------------------
+    # Capture
+    # -----------------------------------------------------
+    async def sample(self):
+        prices = await self.exchange._fetch_market_prices(self.product_ids)
+        ts = self.exchange.milliseconds()
+        data, counts, capacity, index = self.data, self.counts, self.capacity, self._index
+        for price in prices:
+            i = index.get(price.product_id)
+            if i is None:
+                continue
+            pos = counts[i] % capacity
+            data[TIMESTAMP, i, pos] = ts
+            data[BID, i, pos] = math.nan if price.best_bid_price is None else price.best_bid_price
+            data[ASK, i, pos] = math.nan if price.best_ask_price is None else price.best_ask_price
+            data[ORACLE, i, pos] = math.nan if price.oracle_price is None else price.oracle_price
+            counts[i] += 1
+
+    async def run(self):
+        self._running = True
+        loop = asyncio.get_running_loop()
+        while self._running:
+            started = loop.time()
+            try:
+                await self.sample()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+            if self._running:
+                await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def record(self, seconds: float):
+        """Records for ``seconds`` on the adapter's event loop, blocking the caller."""
+        async def timed():
+            task = asyncio.ensure_future(self.run())
+            await asyncio.sleep(seconds)
+            self.stop()
+            await task
+
+        run(timed())
+
+    def stop(self):
+        self._running = False
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
+
+    # -----------------------------------------------------
+    # Queries
+    # -----------------------------------------------------
+    def _series(self, symbol: str) -> np.ndarray:
+        """Samples of one market in chronological order, shape (n, 4)."""
+        i = self._symbol_index[symbol]
+        count = int(self.counts[i])
+        rows = self.data[:, i, :]
+        if count <= self.capacity:
+            return rows[:, :count].T
+        start = count % self.capacity
+        return np.concatenate((rows[:, start:], rows[:, :start]), axis=1).T
+
+    def latest(self, symbol: str) -> Optional[np.ndarray]:
+        """Last sample as [timestamp, bid, ask, oracle], None if nothing was recorded yet."""
+        i = self._symbol_index[symbol]
+        count = int(self.counts[i])
+        if count == 0:
+            return None
+        return self.data[:, i, (count - 1) % self.capacity].copy()
+
+    def window(self, symbol: str, since: Optional[int] = None, until: Optional[int] = None) -> np.ndarray:
+        """Samples with since <= timestamp < until (ms), shape (n, 4)."""
+        series = self._series(symbol)
+        ts = series[:, TIMESTAMP]
+        lo = 0 if since is None else np.searchsorted(ts, since, side="left")
+        hi = len(ts) if until is None else np.searchsorted(ts, until, side="left")
+        return series[lo:hi].copy()
+
+    def resample(self, symbol: str, interval: int, since: Optional[int] = None,
+                 until: Optional[int] = None) -> np.ndarray:
+        """
+        Last sample per ``interval`` ms bucket, shape (buckets, 4) with the
+        timestamp column set to the bucket start.
+        """
+        series = self.window(symbol, since, until)
+        if not len(series):
+            return series
+        buckets = series[:, TIMESTAMP] // interval
+        last = np.flatnonzero(np.append(buckets[1:] != buckets[:-1], True))
+        out = series[last]
+        out[:, TIMESTAMP] = buckets[last] * interval
+        return out
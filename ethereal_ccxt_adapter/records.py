@@ -0,0 +1,96 @@
+import sys
+from typing import Any, Dict, Tuple
+
+from ethereal_ccxt_adapter.const import EOrderSide, EOrderStatus
+
+# field names per DTO class, shared by all records of that class
+_KEYS: Dict[type, Tuple[str, ...]] = {}
+
+# fields that repeat across most records of an account, stored once
+_SHARED_FIELDS = frozenset(("product_id", "subaccount_id", "sender"))
+_shared: Dict[Any, Any] = {}
+
+
+def compact_info(info) -> Tuple[Tuple[str, ...], tuple]:
+    """
+    Splits an SDK DTO (or dict) into a shared key tuple and a value tuple, the
+    ``info`` dict is rebuilt from both on demand. The DTOs stored here are flat.
+    """
+    if isinstance(info, dict):
+        return tuple(info), tuple(info.values())
+    values = vars(info)
+    keys = _KEYS.get(type(info))
+    if keys is None or len(keys) != len(values):
+        keys = _KEYS[type(info)] = tuple(values)
+    return keys, tuple(_share(k, v) for k, v in values.items())
+
+
+def _share(key, value):
+    if key not in _SHARED_FIELDS or value is None:
+        return value
+    if isinstance(value, str):
+        return sys.intern(value)
+    return _shared.setdefault(value, value)
+
+
+class OrderRecord:
+    """
+    Order as stored by the order tracker. Holds the fields the tracker indexes
+    plus the compacted SDK DTO, ``to_ccxt()`` materializes the CCXT dict.
+    Price and amounts are kept as the Decimals of the DTO.
+    """
+
+    __slots__ = ("id", "symbol", "side", "type", "price", "amount", "filled", "status", "_info_keys",
+                 "_info_values")
+
+    def __init__(self, id: str, symbol: str, side, type: str, price, amount, filled, status, info=None):
+        self.id = id
+        self.symbol = symbol
+        self.side = side
+        self.type = type
+        self.price = price
+        self.amount = amount
+        self.filled = filled
+        self.status = status
+        self._info_keys, self._info_values = compact_info(info if info is not None else {})
+
+    @classmethod
+    def from_dto(cls, order, symbol: str) -> "OrderRecord":
+        return cls(
+            str(order.id),
+            symbol,
+            EOrderSide.BUY if order.side == 0 else EOrderSide.SELL,
+            order.type.value.lower(),
+            order.price,
+            order.quantity,
+            order.filled,
+            EOrderStatus.valueOf(str(order.status.value).lower()),
+            order,
+        )
+
+    @property
+    def info(self) -> dict:
+        return dict(zip(self._info_keys, self._info_values))
+
+    def with_status(self, status) -> "OrderRecord":
+        record = OrderRecord.__new__(OrderRecord)
+        for name in OrderRecord.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.status = status
+        return record
+
+    def to_ccxt(self) -> dict:
+        quantity = self.amount or 0
+        filled = self.filled or 0
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.type,
+            "price": float(self.price or 0),
+            "amount": float(quantity),
+            "filled": float(filled),
+            "remaining": float(quantity - filled),
+            "status": self.status,
+            "info": self.info,
+        }
@@ -0,0 +1,62 @@
+"""
+Import time regression check, run with
+
+    python -m ethereal_ccxt_adapter.test.ImportTimeTest
+
+Imports the adapter in fresh interpreters under ``python -X importtime`` and
+fails if one of the deferred heavy dependencies is loaded at import time or
+the adapter's own import time (everything except ccxt, which Ethereal
+subclasses) exceeds the budget.
+"""
+import re
+import subprocess
+import sys
+
+MODULE = "ethereal_ccxt_adapter.Ethereal"
+RUNS = 5
+BUDGET_MS = 150
+
+# imported on first use, never by the module import itself
+DEFERRED = ("ethereal", "web3", "eth_account", "pydantic", "httpx", "numpy")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str):
+    """
+    Returns ({top level package: self time us}, {module: cumulative us}) of one
+    cold import in a fresh interpreter.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True).stderr
+    packages = {}
+    cumulative = {}
+    for match in LINE.finditer(stderr):
+        name = match.group(4)
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + int(match.group(1))
+        cumulative[name] = max(cumulative.get(name, 0), int(match.group(2)))
+    return packages, cumulative
+
+
+def main():
+    runs = [measure(MODULE) for _ in range(RUNS)]
+    packages, cumulative = min(runs, key=lambda r: r[1][MODULE])
+    total = cumulative[MODULE] / 1000
+    own = total - cumulative.get("ccxt", 0) / 1000
+
+    print(f"import {MODULE}: {total:.1f} ms, {own:.1f} ms without ccxt (best of {RUNS})")
+    for name, us in sorted(packages.items(), key=lambda p: -p[1])[:10]:
+        print(f"  {name:<30} {us / 1000:8.1f} ms")
+
+    failures = [f"{name} is imported eagerly" for name in DEFERRED if name in packages]
+    if own > BUDGET_MS:
+        failures.append(f"import time without ccxt {own:.1f} ms exceeds {BUDGET_MS} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Memory benchmark of the order tracker, run with
+
+    python -m ethereal_ccxt_adapter.test.MemoryTest [orders]
+
+Parses synthetic OrderDtos and compares the traced memory of keeping them as
+CCXT dicts (the previous tracker contents) with keeping OrderRecords.
+"""
+import gc
+import sys
+import tracemalloc
+import uuid
+
+from ethereal.models.rest import OrderDto
+
+from ethereal_ccxt_adapter.const import EOrderSide, EOrderStatus
+from ethereal_ccxt_adapter.order_tracker import OrderTracker
+from ethereal_ccxt_adapter.records import OrderRecord
+
+SYMBOL = "SOL/USD:USD"
+PRODUCT_ID = str(uuid.uuid4())
+SUBACCOUNT_ID = str(uuid.uuid4())
+SENDER = "0x" + "ab" * 20
+
+
+def order_dto(i: int) -> OrderDto:
+    return OrderDto.model_validate({
+        "id": str(uuid.uuid4()),
+        "type": "LIMIT",
+        "availableQuantity": "0.75",
+        "quantity": "1.25",
+        "filled": "0.5",
+        "price": "151.37",
+        "stopPrice": "0",
+        "side": i % 2,
+        "status": "NEW",
+        "triggered": "NOT_TRIGGERED",
+        "reduceOnly": False,
+        "close": False,
+        "productId": PRODUCT_ID,
+        "subaccountId": SUBACCOUNT_ID,
+        "sender": SENDER,
+        "createdAt": 1_700_000_000_000 + i,
+        "updatedAt": 1_700_000_000_000 + i,
+        "expiresAt": 1_800_000_000_000,
+    })
+
+
+def traced(build, n: int):
+    gc.collect()
+    tracemalloc.start()
+    kept = build(n)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size
+
+
+def parse_order(order: OrderDto) -> dict:
+    """CCXT dict as the adapter's _parse_order built it before OrderRecord, info from model_dump()."""
+    return {
+        "id": str(order.id),
+        "symbol": SYMBOL,
+        "side": EOrderSide.BUY if order.side == 0 else EOrderSide.SELL,
+        "type": order.type.value.lower(),
+        "price": float(order.price or 0),
+        "amount": float(order.quantity or 0),
+        "filled": float(order.filled or 0),
+        "remaining": float((order.quantity or 0) - (order.filled or 0)),
+        "status": EOrderStatus.valueOf(str(order.status.value).lower()),
+        "info": order.model_dump(),
+    }
+
+
+def as_dicts(n: int):
+    return {str(i): parse_order(order_dto(i)) for i in range(n)}
+
+
+def as_records(n: int):
+    tracker = OrderTracker()
+    for i in range(n):
+        tracker.apply(OrderRecord.from_dto(order_dto(i), SYMBOL))
+    return tracker
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    _, dicts = traced(as_dicts, n)
+    _, records = traced(as_records, n)
+
+    print(f"{n} orders")
+    print(f"  ccxt dicts    {dicts / 2 ** 20:8.2f} MiB  {dicts / n:7.0f} B/order")
+    print(f"  OrderRecords  {records / 2 ** 20:8.2f} MiB  {records / n:7.0f} B/order (incl. tracker indexes)")
+    print(f"  saving        {1 - records / dicts:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ REQUIRES = [
     "python-dotenv",
     "ccxt",
     "ethereal-sdk",
+    "numpy",
 ]
 
 setup(